@@ -1,21 +1,125 @@
 import click
 from escrow_bridge import (network_func, get_exchange_rate, generate_salt, get_payment,
-                           ZERO_ADDRESS, SUPPORTED_NETWORKS, get_decimals, erc20_abi)
+                           ZERO_ADDRESS, get_decimals, erc20_abi)
 from escrow_bridge.cli import (
-    console, print_status, print_panel, progress_bar, print_json, print_table, symbol_map
+    console, symbol_map,
+    print_status as rich_print_status, print_panel as rich_print_panel, progress_bar as rich_progress_bar,
+    print_json as rich_print_json, print_table as rich_print_table,
 )
 import os
+import sys
 import json
 import time
+import glob
+import gzip
+import collections
+import random
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from urllib3.exceptions import NewConnectionError
 import webbrowser
 from dotenv import load_dotenv
 from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+from eth_utils import event_abi_to_log_topic
+from eth_hash.auto import keccak
 import secrets
+import shutil
+import tempfile
 from diskcache import Cache
 
 load_dotenv()
 
+# Output mode, set by the global --output option. "text" renders with rich;
+# "ndjson" streams one event per line to stdout; "json" writes all events as one
+# document when the command exits. Human-oriented messages go to stderr in both
+# structured modes so stdout only carries events.
+OUTPUT_MODE = "text"
+_events = []
+_command = None
+_started_at = time.perf_counter()
+_last_event_at = _started_at
+_events_lock = threading.Lock()
+
+def structured_output():
+    return OUTPUT_MODE != "text"
+
+def emit_event(event, **fields):
+    """Record a structured event with timings. No-op in text mode."""
+    global _last_event_at
+    if not structured_output():
+        return
+    with _events_lock:
+        now = time.perf_counter()
+        record = {
+            "event": event,
+            "command": _command,
+            "ts": round(time.time(), 3),
+            "elapsed": round(now - _started_at, 4),
+            "duration": round(now - _last_event_at, 4),
+            **fields,
+        }
+        _last_event_at = now
+        if OUTPUT_MODE == "ndjson":
+            sys.stdout.write(json.dumps(record, default=str) + "\n")
+            sys.stdout.flush()
+        else:
+            _events.append(record)
+
+def flush_events():
+    if OUTPUT_MODE == "json":
+        sys.stdout.write(json.dumps({"command": _command, "events": _events}, default=str) + "\n")
+        sys.stdout.flush()
+        _events.clear()
+
+def print_status(message, level="info"):
+    if not structured_output():
+        return rich_print_status(message, level=level)
+    sys.stderr.write(f"[{level}] {message}\n")
+    if level == "error":
+        emit_event("error", message=message)
+
+def print_panel(message, tone="info"):
+    if not structured_output():
+        return rich_print_panel(message, tone=tone)
+    sys.stderr.write(f"== {message.splitlines()[0]} ==\n")
+
+def print_table(headers, rows, title=None):
+    if not structured_output():
+        return rich_print_table(headers, rows, title=title)
+    emit_event("table", title=title, headers=list(headers), rows=[list(row) for row in rows])
+
+def print_json(data):
+    if not structured_output():
+        return rich_print_json(data)
+    emit_event("result", data=data)
+
+class _NullProgress:
+    def add_task(self, *args, **kwargs):
+        return None
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def progress_bar(description):
+    if not structured_output():
+        return rich_progress_bar(description)
+    return _NullProgress()
+
+def open_user_url(url):
+    # Batch jobs and replays have nobody to look at a browser
+    if not structured_output() and not replaying():
+        webbrowser.open(url)
+
 STATUS_MAP = {
     'initialized':0,
     'registered':1,
@@ -32,62 +136,650 @@ STATUS_MAP = {
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Go up from escrow_bridge/cli to project root, then to contracts
 CONTRACTS_DIR = os.path.join(BASE_DIR, "..", "..", "..", "contracts")
-# Using EscrowBridge (USDC version) for Base Sepolia
-escrow_bridge_artifact_path = os.path.join(CONTRACTS_DIR, "out", "EscrowBridge.sol", "EscrowBridge.json")
-
-bdag_address_path = os.path.join(CONTRACTS_DIR, "deployments", "blockdag-escrow-bridge.json")
-base_address_path = os.path.join(CONTRACTS_DIR, "deployments", "base-escrow-bridge.json")
+ARTIFACTS_DIR = os.path.join(CONTRACTS_DIR, "out")
+DEPLOYMENTS_DIR = os.path.join(CONTRACTS_DIR, "deployments")
+MANIFEST_SUFFIX = "-escrow-bridge.json"
 
 PRIVATE_KEY = os.getenv('PRIVATE_KEY')
-BLOCKDAG_TESTNET_GATEWAY_URL = os.getenv('BLOCKDAG_TESTNET_GATEWAY_URL', 'https://rpc.primordial.bdagscan.com/')
-BASE_SEPOLIA_GATEWAY_URL = os.getenv('BASE_SEPOLIA_GATEWAY_URL', "https://sepolia.base.org/")
 CHAINSETTLE_API_URL = os.getenv('CHAINSETTLE_API_URL', "https://api.chainsettle.tech")
 
-with open(bdag_address_path, 'r') as f:
-    ESCROW_BRIDGE_ADDRESS_BDAG = json.load(f)['deployedTo']
+# Resilience settings shared by every RPC and HTTP call
+RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', 15))
+HTTP_TIMEOUT = float(os.getenv('CHAINSETTLE_TIMEOUT', 30))
+HEALTH_TIMEOUT = 5
+RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', 3))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', 30))
+RETRYABLE_ERRORS = (requests.RequestException,)
+
+class CircuitOpenError(Exception):
+    """Raised when every endpoint for a call is known to be down."""
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker. Opens after `failure_threshold` consecutive failures and
+    lets a single trial call through once `reset_seconds` have passed.
+    """
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.trial_in_flight:
+                return False
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                # Half-open: only this caller gets through until the trial succeeds or fails
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            if self.trial_in_flight:
+                self.trial_in_flight = False
+                self.opened_at = time.monotonic()
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                print_status(f"Circuit opened for {self.name} after {self.failures} failures", level="warn")
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(endpoint):
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def request_not_sent(error):
+    """True if a requests error happened while connecting, i.e. nothing reached the server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def call_with_retries(fn, endpoint, attempts=None, retry_on=RETRYABLE_ERRORS, retry_if=None):
+    """
+    Call fn() guarded by the endpoint's circuit breaker, retrying on retry_on errors
+    (for which retry_if(error) holds, if given) with exponential backoff.
+    Raises CircuitOpenError without calling fn if the breaker is open.
+    """
+    attempts = attempts or RETRY_ATTEMPTS
+    breaker = get_breaker(endpoint)
+    for attempt in range(attempts):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {endpoint}")
+        try:
+            result = fn()
+        except retry_on as e:
+            breaker.record_failure()
+            if attempt == attempts - 1 or (retry_if is not None and not retry_if(e)):
+                raise
+            delay = backoff_delay(attempt)
+            print_status(f"{endpoint}: {e} (retry {attempt + 1}/{attempts - 1} in {delay:.1f}s)", level="warn")
+            pause(delay)
+        except Exception:
+            # The endpoint answered; release a half-open trial before propagating
+            breaker.record_success()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+# Record/replay of RPC, HTTP and nondeterministic values (salts, clock), set by the
+# global --record/--replay options. None means live traffic.
+TRAFFIC = None
 
-with open(base_address_path, 'r') as f:
-    ESCROW_BRIDGE_ADDRESS_BASE = json.load(f)['deployedTo']
+class ReplayMissError(Exception):
+    """Raised in replay mode for a request that is not in the recording."""
 
-with open(escrow_bridge_artifact_path, 'r') as f:
-    escrow_bridge_abi = json.load(f)['abi']
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return str(value)
 
-# Network configuration with gateway URLs and explorer URLs
-NETWORK_CONFIG = {
-    # "blockdag-testnet": {
-    #     "address": ESCROW_BRIDGE_ADDRESS_BDAG,
-    #     "abi": escrow_bridge_abi,
-    #     "gateway": BLOCKDAG_TESTNET_GATEWAY_URL,
-    #     "explorer": "https://primordial.bdagscan.com/tx/"
-    # },
+class TrafficLog:
+    """
+    Recording of a session as gzipped NDJSON: a header line, then one {"key", "result"}
+    line per call. Replay matches calls by content and hands back the recorded results
+    for each key in order; once a key's results run out its last result repeats, so
+    polling loops behave as they did when recorded. Transport errors are recorded too
+    and re-raised as requests.ConnectionError on replay.
+    """
+    def __init__(self, path, mode, latency=0.0):
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = []
+        self._queues = {}
+        self._last = {}
+        if mode == "replay":
+            with gzip.open(path, "rt") as f:
+                f.readline()  # header
+                for line in f:
+                    entry = json.loads(line)
+                    self._queues.setdefault(entry["key"], collections.deque()).append(entry["result"])
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def call(self, kind, request, fn):
+        key = kind + ":" + json.dumps(request, sort_keys=True, separators=(",", ":"), default=_json_default)
+        if self.replaying:
+            result = self._next(key)
+            if "error" in result:
+                if result.get("not_sent"):
+                    raise requests.ConnectTimeout(result["error"])
+                raise requests.ConnectionError(result["error"])
+            return result["value"]
+
+        try:
+            value = fn()
+        except (requests.RequestException, CircuitOpenError) as e:
+            self._append(key, {"error": str(e), "not_sent": isinstance(e, requests.RequestException) and request_not_sent(e)})
+            raise
+        self._append(key, {"value": value})
+        return value
+
+    def _append(self, key, result):
+        with self._lock:
+            self._entries.append({"key": key, "result": result})
+
+    def _next(self, key):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            elif key not in self._last:
+                raise ReplayMissError(f"No recorded response for {key[:200]}")
+            return self._last[key]
+
+    def save(self):
+        if self.mode != "record":
+            return
+        # Lookups that lost a first_per_network race may still be appending on daemon threads
+        with self._lock:
+            entries = list(self._entries)
+        with gzip.open(self.path, "wt") as f:
+            f.write(json.dumps({"version": 1, "created_at": int(time.time()), "entries": len(entries)}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":"), default=_json_default) + "\n")
+        print_status(f"Recorded {len(entries)} calls to {self.path}", level="info")
+
+def replaying():
+    return TRAFFIC is not None and TRAFFIC.replaying
+
+def recorded_value(name, fn):
+    """fn() live, recorded with --record, or the recorded value with --replay."""
+    if TRAFFIC is None:
+        return fn()
+    return TRAFFIC.call("value", {"name": name}, fn)
+
+def now():
+    return recorded_value("clock", time.time)
+
+def cache_get(key):
+    """
+    Read the local cache as part of the session: recorded with --record and served from
+    the recording with --replay, so a replay does not depend on the state of the cache.
+    """
+    return recorded_value(f"cache:{key}", lambda: cache.get(key))
+
+def pause(seconds):
+    # Replays run at full speed; --replay-latency is applied per call instead
+    if not replaying():
+        time.sleep(seconds)
+
+class Signer:
+    """
+    The sending account. Its address and the transactions it signs are recorded with
+    --record, so a replay needs no private key and does not depend on which key is given.
+    """
+
+    def __init__(self, w3, private_key):
+        self._account = w3.eth.account.from_key(private_key) if private_key else None
+        if self._account is None and not replaying():
+            raise click.ClickException("A private key is required.")
+        self.address = recorded_value("signer", lambda: self._account.address)
+
+    def sign(self, tx):
+        """Sign tx and return the raw transaction bytes."""
+        raw = recorded_value("signed_tx", lambda: bytes(self._account.sign_transaction(tx).raw_transaction))
+        return Web3.to_bytes(hexstr=raw) if isinstance(raw, str) else raw
+
+http_session = requests.Session()
+
+def _http_send(method, url, path, **kwargs):
+    if TRAFFIC is None:
+        return http_session.request(method, url, **kwargs)
+
+    def send():
+        r = http_session.request(method, url, **kwargs)
+        return {"status": r.status_code, "body": r.text, "content_type": r.headers.get("content-type")}
+
+    recorded = TRAFFIC.call("http", {"method": method, "path": path, "json": kwargs.get("json")}, send)
+    r = requests.Response()
+    r.status_code = recorded["status"]
+    r._content = recorded["body"].encode("utf-8")
+    r.encoding = "utf-8"
+    r.url = url
+    r.reason = ""
+    if recorded.get("content_type"):
+        r.headers["content-type"] = recorded["content_type"]
+    return r
+
+def chainsettle_request(method, path, timeout=HTTP_TIMEOUT, attempts=None, **kwargs):
+    """
+    Send a request to the ChainSettle API through the shared retry/breaker layer.
+    GETs are retried on connection errors, timeouts, 429 and 5xx responses. Other methods
+    are not idempotent (e.g. registration), so they are only retried when the connection
+    could not be made; other responses are returned as-is.
+    """
+    url = f"{CHAINSETTLE_API_URL}{path}"
+    idempotent = method.upper() in ("GET", "HEAD")
+
+    def send():
+        r = _http_send(method, url, path, timeout=timeout, **kwargs)
+        if idempotent and (r.status_code == 429 or r.status_code >= 500):
+            r.raise_for_status()
+        return r
+
+    return call_with_retries(send, CHAINSETTLE_API_URL, attempts=attempts,
+                             retry_if=None if idempotent else request_not_sent)
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    """
+    Web3 provider that spreads a network's RPC calls over several gateway URLs.
+    Each request goes to the first endpoint whose breaker is closed, failing over to the
+    next on transport errors, with backoff between full rounds. JSON-RPC error responses
+    (reverts etc.) are returned to web3 untouched and do not count as endpoint failures.
+    """
+    def __init__(self, endpoint_uris, timeout=RPC_TIMEOUT, attempts=None, name=None, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.endpoint_uris = list(endpoint_uris)
+        self.attempts = attempts or RETRY_ATTEMPTS
+        self.providers = [
+            Web3.HTTPProvider(uri, request_kwargs={"timeout": timeout}, exception_retry_configuration=None)
+            for uri in self.endpoint_uris
+        ]
+
+    def make_request(self, method, params):
+        if TRAFFIC is None:
+            return self._failover_request(method, params)
+        return TRAFFIC.call("rpc", {"network": self.name, "method": method, "params": params},
+                            lambda: self._failover_request(method, params))
+
+    def _failover_request(self, method, params):
+        last_error = None
+        # A send that timed out after connecting may have been broadcast already
+        maybe_sent = False
+        for attempt in range(self.attempts):
+            tried = False
+            for provider in self.providers:
+                breaker = get_breaker(provider.endpoint_uri)
+                if not breaker.allow():
+                    continue
+                tried = True
+                try:
+                    response = provider.make_request(method, params)
+                except RETRYABLE_ERRORS as e:
+                    breaker.record_failure()
+                    last_error = e
+                    maybe_sent = maybe_sent or not request_not_sent(e)
+                    print_status(f"{provider.endpoint_uri}: {method} failed: {e}", level="warn")
+                    continue
+                except Exception:
+                    breaker.record_success()
+                    raise
+                breaker.record_success()
+                if method == "eth_sendRawTransaction" and "error" in response:
+                    return self._resolve_send_error(provider, params, response, maybe_sent)
+                return response
+
+            if not tried:
+                raise CircuitOpenError(f"All gateways down: {', '.join(self.endpoint_uris)}")
+            if attempt < self.attempts - 1:
+                pause(backoff_delay(attempt))
+
+        raise last_error
+
+    def _resolve_send_error(self, provider, params, response, maybe_sent):
+        """
+        Turn a failed-over eth_sendRawTransaction error into success when the tx is already
+        in the network: "already known" always, any error (e.g. "nonce too low") if an
+        earlier gateway may have broadcast it and this one can find it by hash.
+        """
+        raw = params[0]
+        tx_hash = "0x" + keccak(Web3.to_bytes(hexstr=raw) if isinstance(raw, str) else bytes(raw)).hex()
+        message = str(response["error"].get("message", "")).lower()
+        known = "already known" in message or "known transaction" in message
+        if not known and maybe_sent:
+            try:
+                known = provider.make_request("eth_getTransactionByHash", [tx_hash]).get("result") is not None
+            except RETRYABLE_ERRORS:
+                known = False
+        if known:
+            print_status(f"Transaction {tx_hash[:18]}... already broadcast, continuing", level="warn")
+            return {"jsonrpc": "2.0", "id": response.get("id"), "result": tx_hash}
+        return response
+
+    def is_connected(self, show_traceback=False):
+        return any(p.is_connected(show_traceback) for p in self.providers)
+
+def gateway_urls(value):
+    """Gateway env vars may list several comma-separated URLs for failover."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+# Defaults for known chains, keyed by network name. A deployment manifest can set
+# any of these fields itself, so a new chain only needs a manifest (and optionally
+# a <NETWORK>_GATEWAY_URL env var).
+NETWORK_DEFAULTS = {
     "base-sepolia": {
-        "address": ESCROW_BRIDGE_ADDRESS_BASE,
-        "abi": escrow_bridge_abi,
-        "gateway": BASE_SEPOLIA_GATEWAY_URL,
-        "explorer": "https://sepolia.basescan.org/tx/"
+        "manifest": "base",
+        "gateway": "https://sepolia.base.org/",
+        "explorer": "https://sepolia.basescan.org/tx/",
+        "token": {"symbol": "USDC"},
+    },
+    "blockdag-testnet": {
+        "manifest": "blockdag",
+        "gateway": "https://rpc.primordial.bdagscan.com/",
+        "explorer": "https://primordial.bdagscan.com/tx/",
+        "token": {"symbol": "BDAG"},
+        # Gateway and ABI not confirmed yet; a manifest with "enabled": true turns it on
+        "enabled": False,
     },
 }
+MANIFEST_FIELDS = ("gateway", "gateways", "explorer", "token", "artifact", "enabled")
 
-# Keep old name for compatibility
-escrow_bridge_config = {net: {"address": cfg["address"], "abi": cfg["abi"]} for net, cfg in NETWORK_CONFIG.items()}
+def gateway_env_var(network):
+    return network.upper().replace("-", "_") + "_GATEWAY_URL"
 
-base_w3 = Web3(Web3.HTTPProvider(BASE_SEPOLIA_GATEWAY_URL))
-base_contract = base_w3.eth.contract(address=ESCROW_BRIDGE_ADDRESS_BASE, abi=escrow_bridge_abi)
+@functools.lru_cache(maxsize=None)
+def load_abi(artifact="EscrowBridge"):
+    with open(os.path.join(ARTIFACTS_DIR, f"{artifact}.sol", f"{artifact}.json"), 'r') as f:
+        return json.load(f)['abi']
 
-# Fetch max escrow time with fallback
-try:
-    max_escrow_time = base_contract.functions.maxEscrowTime().call()
-except Exception as e:
-    print_status(f"Warning: Could not fetch maxEscrowTime: {e}", level="warn")
-    max_escrow_time = 3600  # Default 1 hour
+@functools.lru_cache(maxsize=None)
+def load_network_registry():
+    """
+    Discover every deployment manifest under contracts/deployments.
+    Returns {network: {"address", "abi", "gateway", "gateways", "explorer", "token", "manifest"}}.
+    Loaded on first use and cached for the rest of the process.
+    """
+    aliases = {cfg["manifest"]: name for name, cfg in NETWORK_DEFAULTS.items()}
+    registry = {}
+    for path in sorted(glob.glob(os.path.join(DEPLOYMENTS_DIR, "*" + MANIFEST_SUFFIX))):
+        try:
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            stem = os.path.basename(path)[:-len(MANIFEST_SUFFIX)]
+            name = manifest.get("network") or aliases.get(stem, stem)
+            cfg = {**NETWORK_DEFAULTS.get(name, {}), **{k: manifest[k] for k in MANIFEST_FIELDS if k in manifest}}
+            if not cfg.get("enabled", True):
+                continue
+
+            env_gateway = os.getenv(gateway_env_var(name))
+            if env_gateway:
+                gateways = gateway_urls(env_gateway)
+            else:
+                gateways = cfg.get("gateways") or gateway_urls(cfg.get("gateway", ""))
+            if not gateways:
+                print_status(f"Skipping {name}: no gateway configured in {path} or {gateway_env_var(name)}", level="warn")
+                continue
+
+            registry[name] = {
+                "address": Web3.to_checksum_address(manifest["deployedTo"]),
+                "abi": load_abi(cfg.get("artifact", "EscrowBridge")),
+                "gateway": gateways[0],
+                "gateways": gateways,
+                "explorer": cfg.get("explorer", ""),
+                "token": cfg.get("token", {}),
+                "manifest": path,
+            }
+        except (OSError, ValueError, KeyError) as e:
+            print_status(f"Skipping deployment manifest {path}: {e}", level="warn")
+    return registry
+
+def get_network(network):
+    registry = load_network_registry()
+    if network not in registry:
+        raise click.ClickException(f"Unknown network {network}. Available: {', '.join(registry) or 'none'}")
+    return registry[network]
+
+class NetworkType(click.ParamType):
+    """Network choice validated against the registry when the option is parsed, not at import."""
+    name = "network"
+
+    def convert(self, value, param, ctx):
+        registry = load_network_registry()
+        if value not in registry:
+            self.fail(f"{value!r} is not a deployed network. Choose from: {', '.join(registry) or 'none'}", param, ctx)
+        return value
+
+    def get_metavar(self, param, *args):
+        return "NETWORK"
+
+class PrivateKeyOption(click.Option):
+    """--private-key, only prompted for when it will be used: --replay signs nothing."""
+
+    def prompt_for_value(self, ctx):
+        if replaying():
+            return None
+        return super().prompt_for_value(ctx)
+
+def make_web3(network):
+    return Web3(FailoverHTTPProvider(get_network(network)["gateways"], name=network))
+
+def make_bridge(network, w3=None):
+    cfg = get_network(network)
+    w3 = w3 or make_web3(network)
+    return w3, w3.eth.contract(address=cfg["address"], abi=cfg["abi"])
+
+def resolve_token(w3, bridge, network):
+    """
+    Return (erc20, token_address, decimals, symbol) for a network's bridge.
+    Uses registry token metadata when it has address and decimals, else reads them on-chain.
+    """
+    token = get_network(network)["token"]
+    if "address" in token and "decimals" in token:
+        if int(token["address"], 16) == 0:
+            return None, ZERO_ADDRESS, token["decimals"], token.get("symbol", "BDAG")
+        token_address = Web3.to_checksum_address(token["address"])
+        erc20 = w3.eth.contract(address=token_address, abi=erc20_abi)
+        return erc20, token_address, token["decimals"], token.get("symbol", "USDC")
+
+    try:
+        usdc_address = bridge.functions.usdcToken().call()
+        erc20 = w3.eth.contract(address=usdc_address, abi=erc20_abi)
+        return erc20, usdc_address, erc20.functions.decimals().call(), token.get("symbol", "USDC")
+    except Exception:
+        return None, ZERO_ADDRESS, 18, token.get("symbol", "BDAG")
+
+def run_per_network(fn, networks=None):
+    """
+    Run fn(network) for each network on its own worker thread.
+    Returns {network: result}, with the raised exception as the result when fn fails.
+    """
+    networks = list(networks if networks is not None else load_network_registry())
+    results = {}
+    if not networks:
+        return results
+    with ThreadPoolExecutor(max_workers=len(networks), thread_name_prefix="network") as pool:
+        futures = {pool.submit(fn, net): net for net in networks}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+    return {net: results[net] for net in networks}
+
+def first_per_network(fn, networks=None):
+    """
+    Run fn(network) for each network on its own daemon thread and return (network, result)
+    for the first non-None result, without waiting for slower networks. Errors are reported
+    and skipped. Returns (None, None) if no network produced a result.
+    """
+    networks = list(networks if networks is not None else load_network_registry())
+    results = queue.Queue()
+
+    def worker(net):
+        try:
+            results.put((net, fn(net), None))
+        except Exception as e:
+            results.put((net, None, e))
+
+    for net in networks:
+        threading.Thread(target=worker, args=(net,), name=f"network-{net}", daemon=True).start()
+
+    for _ in networks:
+        net, result, error = results.get()
+        if error is not None:
+            print_status(f"{net}: {error}", level="warn")
+        elif result is not None:
+            return net, result
+    return None, None
 
 cache = Cache("network_lookup_cache")
 
 TTL_SECONDS = 3600  # 1 hour
 
+# Plan files: a magic line, a JSON header line, then fixed-width records of
+# salt (32 bytes) + settlement_id (18 raw bytes) + escrow_id (32 bytes).
+PLAN_MAGIC = b"EBPLAN1\n"
+SALT_SIZE = 32
+SETTLEMENT_ID_SIZE = 18
+PLAN_RECORD_SIZE = SALT_SIZE + SETTLEMENT_ID_SIZE + 32
+
+def compute_escrow_id(salt_bytes, settlement_id):
+    """
+    keccak256(abi.encodePacked(bytes32 salt, string settlement_id)).
+    Same result as w3.solidity_keccak(["bytes32", "string"], ...) without the ABI encoding overhead.
+    """
+    return keccak(salt_bytes + settlement_id.encode("utf-8"))
+
+def generate_plan(count):
+    """
+    Generate `count` (salt, settlement_id, escrow_id) records in bulk.
+    Returns the packed record bytes, PLAN_RECORD_SIZE bytes per record.
+    """
+    salts = os.urandom(SALT_SIZE * count)
+    settlement_ids = os.urandom(SETTLEMENT_ID_SIZE * count)
+    records = []
+    for i in range(count):
+        salt = salts[i * SALT_SIZE:(i + 1) * SALT_SIZE]
+        raw_id = settlement_ids[i * SETTLEMENT_ID_SIZE:(i + 1) * SETTLEMENT_ID_SIZE]
+        records.append(salt + raw_id + keccak(salt + raw_id.hex().encode("ascii")))
+    return b"".join(records)
+
+def write_plan(path, records, network):
+    count = len(records) // PLAN_RECORD_SIZE
+    header = {"version": 1, "count": count, "network": network, "created_at": int(time.time())}
+    with open(path, "wb") as f:
+        f.write(PLAN_MAGIC)
+        f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        f.write(records)
+    return header
+
+def read_plan_entry(path, index, network=None):
+    """
+    Read a single record from a plan file without loading the whole file.
+    Returns a dict with salt, settlement_id and escrow_id as used by the other commands.
+    Rejects the plan if `network` is given and the plan was made for a different one.
+    """
+    with open(path, "rb") as f:
+        if f.readline() != PLAN_MAGIC:
+            raise click.ClickException(f"{path} is not an escrow plan file.")
+        header = json.loads(f.readline())
+        if network is not None and header.get("network") != network:
+            raise click.ClickException(f"Plan {path} was made for {header.get('network')}, not {network}.")
+        if index < 0 or index >= header["count"]:
+            raise click.ClickException(f"Plan index {index} out of range (plan has {header['count']} entries).")
+        f.seek(f.tell() + index * PLAN_RECORD_SIZE)
+        record = f.read(PLAN_RECORD_SIZE)
+
+    salt = record[:SALT_SIZE]
+    raw_id = record[SALT_SIZE:SALT_SIZE + SETTLEMENT_ID_SIZE]
+    escrow_id = record[SALT_SIZE + SETTLEMENT_ID_SIZE:]
+    return {
+        "salt": "0x" + salt.hex(),
+        "settlement_id": raw_id.hex(),
+        "escrow_id": escrow_id.hex(),
+        "network": header.get("network"),
+    }
+
+def plan_cursor_key(path):
+    return f"plan_cursor:{os.path.abspath(path)}"
+
+def new_salt_and_settlement_id():
+    salt = generate_salt()
+    if not salt.startswith("0x"):
+        salt = "0x" + salt
+    return salt, secrets.token_hex(SETTLEMENT_ID_SIZE)
+
+def claim_plan_index(plan, plan_index=None):
+    """
+    Atomically claim a plan entry, so no two runs ever use the same one.
+    Claims `plan_index` if given, else the next unclaimed entry after the cursor.
+    An entry stays claimed even if its transaction later fails.
+    """
+    tag = plan_cursor_key(plan)
+    if plan_index is not None:
+        if not cache.add(f"{tag}:{plan_index}", True, tag=tag):
+            raise click.ClickException(f"Plan entry {plan_index} of {plan} was already used.")
+        return plan_index
+    while True:
+        index = cache.incr(tag, default=0) - 1
+        # Skip entries already claimed explicitly with --plan-index
+        if cache.add(f"{tag}:{index}", True, tag=tag):
+            return index
+
+def prepare_escrow_ids(plan=None, plan_index=None, network=None):
+    """
+    Return (salt, settlement_id, escrow_id_bytes, plan_index).
+    Takes the next unused entry from a plan file when one is given, otherwise generates fresh values.
+    """
+    if plan:
+        # Validate the plan and network before claiming anything from it
+        read_plan_entry(plan, plan_index or 0, network=network)
+        plan_index = recorded_value("plan_claim", lambda: claim_plan_index(plan, plan_index))
+        entry = read_plan_entry(plan, plan_index, network=network)
+        print_status(f"Using plan entry #{plan_index} from {plan}", level="info")
+        return entry["salt"], entry["settlement_id"], Web3.to_bytes(hexstr=entry["escrow_id"]), plan_index
+
+    salt, settlement_id = recorded_value("escrow_ids", new_salt_and_settlement_id)
+    salt_bytes = Web3.to_bytes(hexstr=salt)
+    return salt, settlement_id, compute_escrow_id(salt_bytes, settlement_id), None
+
 def is_chainsettle_api_running():
     try:
-        r = requests.get(f"{CHAINSETTLE_API_URL}/utils/health", timeout=5)
+        r = chainsettle_request("GET", "/utils/health", timeout=HEALTH_TIMEOUT)
         return r.json().get("status") == "ok"
     except Exception as e:
         print_status(f"Error connecting to ChainSettle API: {e}", level="error")
@@ -100,9 +792,10 @@ def poll_status_func(escrowId, bridge, max_attempts=60, delay=5):
     max_escrow_time = bridge.functions.maxEscrowTime().call()
 
     for attempt in range(1, max_attempts + 1):
-        elapsed_time = time.time() - created_at
+        elapsed_time = now() - created_at
         if elapsed_time > max_escrow_time:
             print_status(f"Escrow {escrowId} has exceeded max escrow time.", level="error")
+            emit_event("poll_done", escrow_id=escrowId, outcome="expired")
             return
 
         time_left = max_escrow_time - elapsed_time
@@ -117,77 +810,207 @@ def poll_status_func(escrowId, bridge, max_attempts=60, delay=5):
         status_enum = bridge.functions.getSettlementStatus(escrow_id_bytes).call()
         status = STATUS_MAP.get(status_enum, "unknown")
         print_status(f"Oracle status: {status.upper()}", level="info")
+        emit_event("poll", escrow_id=escrowId, attempt=attempt, oracle_status=status,
+                   settled=isSettled, seconds_left=round(time_left))
 
         if escrow_id_bytes in completed_escrows:
             print_status(f"Escrow {escrowId} is completed.", level="success")
+            emit_event("poll_done", escrow_id=escrowId, outcome="completed")
             break
         elif escrow_id_bytes in pending_escrows:
             print_status(f"Escrow {escrowId} is still pending...", level="warn")
-            time.sleep(delay)
+            pause(delay)
             continue
         else:
             if isSettled:
                 print_status(f"Escrow {escrowId} is settled but not in completed escrows.", level="success")
+                emit_event("poll_done", escrow_id=escrowId, outcome="settled")
                 break
             else:
                 print_status(f"Escrow {escrowId} not found in pending or completed escrows.", level="error")
+                emit_event("poll_done", escrow_id=escrowId, outcome="not_found")
                 break
 
+TRANSFER_TOPIC = keccak(b"Transfer(address,address,uint256)")
+
+def _topic_address(topic):
+    return "0x" + bytes(topic)[-20:].hex()
+
+def bridge_transfers(receipt, bridge_address):
+    """
+    ERC20 Transfer logs in a receipt that move tokens out of the bridge.
+    Returns a list of {"token", "to", "amount_raw"}; reads nothing from the chain.
+    """
+    bridge_address = bridge_address.lower()
+    transfers = []
+    for log in receipt["logs"]:
+        topics = log["topics"]
+        if len(topics) != 3 or bytes(topics[0]) != TRANSFER_TOPIC:
+            continue
+        if _topic_address(topics[1]) != bridge_address:
+            continue
+        transfers.append({
+            "token": log["address"],
+            "to": Web3.to_checksum_address(_topic_address(topics[2])),
+            "amount_raw": int.from_bytes(bytes(log["data"]), "big"),
+        })
+    return transfers
+
+# Emitted once per escrow by settlePayment; the payout field differs between the
+# USDC (EscrowBridge) and native (EscrowBridgeETH) contracts.
+SETTLEMENT_EVENT = "PaymentSettled"
+SETTLEMENT_PAYOUT_FIELDS = ("payoutTokensAfterDeskFee", "payoutWeiAfterFee")
+
+def settlement_event_abi(bridge):
+    """The bridge's PaymentSettled event ABI, or None if the contract has none."""
+    return next((item for item in bridge.abi
+                 if item.get("type") == "event" and item.get("name") == SETTLEMENT_EVENT), None)
+
+def verify_settlement(w3, bridge, escrow_id_bytes, recipient, token_address, from_block):
+    """
+    Attribute the exact amount paid for an escrow from its settlement receipt.
+
+    Finds the PaymentSettled log for this escrow ID after `from_block`, then reads the
+    Transfer logs of that transaction. Costs one log query and one receipt fetch, and is
+    unaffected by other transfers to the recipient. Returns None if no settlement log is found.
+    """
+    event_abi = settlement_event_abi(bridge)
+    if event_abi is None:
+        return None
+    event_topic = "0x" + event_abi_to_log_topic(event_abi).hex()
+    escrow_topic = "0x" + bytes(escrow_id_bytes).hex()
+
+    logs = w3.eth.get_logs({
+        "address": bridge.address,
+        "fromBlock": from_block,
+        "toBlock": "latest",
+        "topics": [event_topic, escrow_topic],
+    })
+    if not logs:
+        return None
+
+    tx_hash = logs[-1]["transactionHash"]
+    receipt = w3.eth.get_transaction_receipt(tx_hash)
+
+    settled = {}
+    for log in receipt["logs"]:
+        topics = ["0x" + bytes(t).hex() for t in log["topics"]]
+        if log["address"].lower() == bridge.address.lower() and topics[:2] == [event_topic, escrow_topic]:
+            args = bridge.events[SETTLEMENT_EVENT]().process_log(log)["args"]
+            settled = {k: "0x" + v.hex() if isinstance(v, bytes) else v for k, v in args.items()}
+
+    if token_address != ZERO_ADDRESS:
+        paid = [t for t in bridge_transfers(receipt, bridge.address)
+                if t["to"] == recipient and t["token"].lower() == token_address.lower()]
+        amount_raw = sum(t["amount_raw"] for t in paid)
+    else:
+        # Native payouts leave no Transfer log, take the payout from the settlement event
+        payout_field = next((f for f in SETTLEMENT_PAYOUT_FIELDS if f in settled), None)
+        amount_raw = settled[payout_field] if payout_field else None
+
+    return {
+        "tx_hash": "0x" + bytes(tx_hash).hex(),
+        "block": receipt["blockNumber"],
+        "status": receipt["status"],
+        "amount_raw": amount_raw,
+        "event": settled,
+    }
+
 def find_network_for_settlement(settlement_id):
     """
     Look for the network and registry type that contains the given settlement_id.
-    First checks cache, then falls back to RPC calls if not cached.
+    First checks cache, then probes every registered network in parallel and
+    returns as soon as one of them has it.
     Returns (network, contract) on success, else (None, None).
     """
 
     if isinstance(settlement_id, str):
         settlement_id = Web3.to_bytes(hexstr=settlement_id)
 
-    cached_result = cache.get(settlement_id.hex())
-    if cached_result:
+    cached_result = cache_get(settlement_id.hex())
+    if cached_result and cached_result["network"] in load_network_registry():
         network = cached_result["network"]
         address = cached_result["address"]
-        abi = escrow_bridge_config[network]["abi"]
-        contract = base_w3.eth.contract(address=address, abi=abi)
+        abi = get_network(network)["abi"]
+        contract = make_web3(network).eth.contract(address=address, abi=abi)
         return network, contract
 
-    for net in SUPPORTED_NETWORKS:
-        w3 = base_w3
-        address = escrow_bridge_config[net]["address"]
-        abi = escrow_bridge_config[net]["abi"]
+    def probe(net):
+        # Retries and gateway failover happen in the provider
+        _, contract = make_bridge(net)
+        payment = contract.functions.payments(settlement_id).call()
+        # if escrow was never initialized, payer will be address(0)
+        if payment[0] != "0x0000000000000000000000000000000000000000":
+            return contract
+        return None
+
+    net, contract = first_per_network(probe)
+    if net is None:
+        return None, None
+
+    entry = {
+        "network": net,
+        "address": contract.address,
+    }
+    # Store in cache with TTL
+    cache.set(settlement_id.hex(), entry, expire=TTL_SECONDS)
+    return net, contract
 
+class EventGroup(click.Group):
+    """Command group that ends every structured run with a "done" event saying how it went."""
+    def invoke(self, ctx):
         try:
-            contract = w3.eth.contract(address=address, abi=abi)
-        except Exception as e:
-            print_status(f"Error loading contract for {net}: {e}", level="error")
-            continue
-
-        for attempt in range(3):
-            try:
-                payment = contract.functions.payments(settlement_id).call()
-
-                # if escrow was never initialized, payer will be address(0)
-                if payment[0] != "0x0000000000000000000000000000000000000000":
-                    entry = {
-                        "network": net,
-                        "address": address,
-                    }
-                    contract = w3.eth.contract(address=address, abi=abi)
-                    # Store in cache with TTL
-                    cache.set(settlement_id.hex(), entry, expire=TTL_SECONDS)
-                    return net, contract
-
-                break  # stop retry loop if not found
-            except Exception as call_error:
-                print_status(f"{net}: {call_error}", level="warn")
-                time.sleep(1)
-
-    return None, None
-
-@click.group()
-def cli():
+            result = super().invoke(ctx)
+        except click.exceptions.Exit as e:
+            emit_event("done", ok=e.exit_code == 0, error=None)
+            raise
+        except click.ClickException as e:
+            emit_event("done", ok=False, error=e.format_message(), error_type=type(e).__name__)
+            raise
+        except (Exception, click.Abort, KeyboardInterrupt) as e:
+            emit_event("done", ok=False, error=str(e) or type(e).__name__, error_type=type(e).__name__)
+            raise
+        emit_event("done", ok=True, error=None)
+        return result
+
+@click.group(cls=EventGroup)
+@click.option("--output", "output_mode", default="text", envvar="ESCROW_BRIDGE_OUTPUT",
+              type=click.Choice(["text", "json", "ndjson"]), help="Output format; json/ndjson emit structured events on stdout.")
+@click.option("--record", "record_path", default=None, type=click.Path(dir_okay=False, writable=True),
+              help="Record all RPC/HTTP traffic of this run to a file.")
+@click.option("--replay", "replay_path", default=None, type=click.Path(exists=True, dir_okay=False),
+              help="Run offline against traffic recorded with --record.")
+@click.option("--replay-latency", default=0.0, type=click.FloatRange(min=0), help="Milliseconds of latency to inject per replayed call.")
+@click.pass_context
+def cli(ctx, output_mode, record_path, replay_path, replay_latency):
     """Escrow Bridge Contract CLI"""
-    pass
+    global OUTPUT_MODE, TRAFFIC, _command, _started_at, _last_event_at
+    OUTPUT_MODE = output_mode
+    _command = ctx.invoked_subcommand
+    _started_at = _last_event_at = time.perf_counter()
+    ctx.call_on_close(flush_events)
+
+    if record_path and replay_path:
+        raise click.UsageError("--record and --replay are mutually exclusive.")
+    if record_path:
+        TRAFFIC = TrafficLog(record_path, "record")
+        ctx.call_on_close(TRAFFIC.save)
+    elif replay_path:
+        TRAFFIC = TrafficLog(replay_path, "replay", latency=replay_latency / 1000)
+        use_scratch_cache(ctx)
+
+def use_scratch_cache(ctx):
+    """Point the cache at a temporary directory for this run, so replays never touch the real cache."""
+    global cache
+    scratch_dir = tempfile.mkdtemp(prefix="escrow-bridge-replay-")
+    cache.close()
+    cache = Cache(scratch_dir)
+
+    def cleanup():
+        cache.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    ctx.call_on_close(cleanup)
 
 @click.command()
 def health():
@@ -197,6 +1020,7 @@ def health():
         task = progress.add_task("Checking health...", total=None)
         result = is_chainsettle_api_running()
 
+    emit_event("health", reachable=result)
     if result:
         print_status("ChainSettle Oracle is reachable.", level="success")
     else:
@@ -208,18 +1032,57 @@ def config():
     print_panel("Escrow Bridge Configuration", tone="info")
 
     config_display = {}
-    for net in SUPPORTED_NETWORKS:
-        config_display[net] = {"address": escrow_bridge_config[net]["address"]}
+    for net, cfg in load_network_registry().items():
+        config_display[net] = {
+            "address": cfg["address"],
+            "gateways": cfg["gateways"],
+            "explorer": cfg["explorer"],
+            "token": cfg["token"],
+            "manifest": cfg["manifest"],
+        }
 
     print_json(config_display)
 
+@click.command()
+def networks():
+    """Show every registered network, queried in parallel."""
+    print_panel("Escrow Bridge Networks", tone="info")
+
+    def network_status(net):
+        w3, bridge = make_bridge(net)
+        erc20, token_address, token_decimals, symbol = resolve_token(w3, bridge, net)
+        return {
+            "chain_id": w3.eth.chain_id,
+            "block": w3.eth.block_number,
+            "address": bridge.address,
+            "free_balance": bridge.functions.getFreeBalance().call() / (10 ** token_decimals),
+            "pending_escrows": len(bridge.functions.getPendingEscrows().call()),
+            "symbol": symbol,
+        }
+
+    with progress_bar("Querying networks...") as progress:
+        task = progress.add_task("Querying networks...", total=None)
+        results = run_per_network(network_status)
+
+    rows = []
+    for net, status in results.items():
+        if isinstance(status, Exception):
+            print_status(f"{net}: {status}", level="error")
+            rows.append((net, "-", "-", "unreachable"))
+            continue
+        emit_event("network", network=net, **status)
+        rows.append((net, str(status["block"]), str(status["pending_escrows"]),
+                     f"{status['free_balance']:.6f} {status['symbol']}"))
+
+    print_table(["Network", "Block", "Pending", "Free Balance"], rows, title="Networks")
+
 @click.command()
 @click.option("--escrow-id", default=None, help="The escrow ID hash to fetch details for.")
 def payment_info(escrow_id):
     """Fetch payment info for an escrow ID."""
     # Use global if not passed as argument
     if escrow_id is None:
-        escrow_id = cache.get("last_escrow_id")
+        escrow_id = cache_get("last_escrow_id")
         if not escrow_id:
             print_status("No escrow ID provided and no cached escrow_id found.", level="error")
             raise click.ClickException("No escrow ID provided.")
@@ -256,7 +1119,7 @@ def poll_status(escrow_id, timeout, delay):
     """Poll the status of an escrow until completion."""
     # Use global if not passed as argument
     if escrow_id is None:
-        escrow_id = cache.get("last_escrow_id")
+        escrow_id = cache_get("last_escrow_id")
         if not escrow_id:
             print_status("No escrow ID provided and no cached escrow_id found.", level="error")
             raise click.ClickException("No escrow ID provided.")
@@ -273,10 +1136,11 @@ def poll_status(escrow_id, timeout, delay):
 
 @click.command()
 @click.option("--amount", default=1, type=int, help="Amount of BDAG/USDC you wish to receive.")
-@click.option("--network", default="base-sepolia", type=click.Choice(SUPPORTED_NETWORKS), help="Blockchain network to use.")
+@click.option("--network", default="base-sepolia", type=NetworkType(), help="Blockchain network to use.")
 @click.option("--recipient", default=None, type=str, help="EVM address of the recipient, defaults to sender address if not provided.")
 @click.option(
     "--private-key",
+    cls=PrivateKeyOption,
     envvar="PRIVATE_KEY",
     prompt="Enter your private key",
     hide_input=True,
@@ -285,17 +1149,18 @@ def poll_status(escrow_id, timeout, delay):
 @click.option("-f", "--force", is_flag=True, help="Force the payment even if ChainSettle API is unreachable or account is under estimated gas.")
 @click.option("-v", "--verbose", is_flag=True, help="Enable verbose output.")
 @click.option("--gas-estimate-factor", default=1.25, type=float, help="Factor to scale the gas estimate by.")
-def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_factor):
+@click.option("--plan", default=None, type=click.Path(exists=True, dir_okay=False), help="Plan file from the `plan` command to take salt/settlement ID from.")
+@click.option("--plan-index", default=None, type=int, help="Plan entry to use, defaults to the next unused entry.")
+def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_factor, plan, plan_index):
     """Initialize escrow, register with oracle, and poll for settlement."""
     print_panel("Initialize Escrow", tone="info")
     print_status(f"Initializing escrow on {network} for amount: {amount}...", level="info")
 
-    GATEWAY = NETWORK_CONFIG[network]["gateway"]
-    EXPL_URL = NETWORK_CONFIG[network]["explorer"]
+    EXPL_URL = get_network(network)["explorer"]
 
     try:
-        w3 = Web3(Web3.HTTPProvider(GATEWAY))
-        account = w3.eth.account.from_key(private_key)
+        w3, bridge = make_bridge(network)
+        account = Signer(w3, private_key)
     except Exception as e:
         print_status(f"Error setting up Web3 or account: {e}", level="error")
         raise click.ClickException(str(e))
@@ -310,10 +1175,7 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
     if not recipient:
         recipient = account.address
 
-    contract_address = escrow_bridge_config[network]['address']
-    bridge_abi = escrow_bridge_config[network]['abi']
-
-    bridge = w3.eth.contract(address=contract_address, abi=bridge_abi)
+    contract_address = bridge.address
     max_escrow_time = bridge.functions.maxEscrowTime().call()
 
     recipient_email = bridge.functions.recipientEmail().call()
@@ -330,17 +1192,7 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
     min_raw = bridge.functions.minPaymentAmount().call()
     max_raw = bridge.functions.maxPaymentAmount().call()
 
-    try:
-        usdc_address = bridge.functions.usdcToken().call()
-        erc20 = w3.eth.contract(address=usdc_address, abi=erc20_abi)
-        token_decimals = erc20.functions.decimals().call()
-        symbol = "USDC"
-        token_address = usdc_address
-    except Exception as e:
-        token_decimals = 18
-        symbol = "BDAG"
-        token_address = ZERO_ADDRESS
-        erc20 = None
+    erc20, token_address, token_decimals, symbol = resolve_token(w3, bridge, network)
 
     fee = bridge.functions.fee().call()
     FEE_DENOMINATOR = bridge.functions.FEE_DENOMINATOR().call()
@@ -363,20 +1215,12 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
         print_status(f"Amount {amount} {symbol} exceeds available funds ({human_ramp_balance:.6f} {symbol})", level="error")
         raise click.ClickException("Insufficient bridge funds.")
 
-    salt = generate_salt()
-    if not salt.startswith("0x"):
-        salt = "0x" + salt
-
-    salt_bytes = Web3.to_bytes(hexstr=salt)
-    settlement_id = secrets.token_hex(18)
-
-    escrow_id_bytes = w3.solidity_keccak(
-        ["bytes32", "string"],
-        [salt_bytes, settlement_id]
-    )
+    salt, settlement_id, escrow_id_bytes, plan_index = prepare_escrow_ids(plan, plan_index, network)
 
     escrow_id = escrow_id_bytes.hex()
     print_status(f"Computed escrow_id = {escrow_id[:24]}...", level="highlight")
+    emit_event("escrow_id", escrow_id=escrow_id, salt=salt, settlement_id=settlement_id,
+               network=network, plan_index=plan_index)
 
     # Build and send transaction
     print_status("Building transaction...", level="info")
@@ -417,8 +1261,7 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
             "maxFeePerGas": max_fee,
             "type": 2
         })
-        signed_init = account.sign_transaction(base_tx)
-        h_init = w3.eth.send_raw_transaction(signed_init.raw_transaction)
+        h_init = w3.eth.send_raw_transaction(account.sign(base_tx))
         receipt_init = w3.eth.wait_for_transaction_receipt(h_init)
 
     if receipt_init.status != 1:
@@ -427,6 +1270,8 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
 
     print_status(f"initPayment submitted {symbol_map['arrow']} Tx: 0x{h_init.hex()[:16]}...", level="success")
     print_status(f"Explorer: {EXPL_URL}0x{h_init.hex()}", level="info")
+    emit_event("init_payment", escrow_id=escrow_id, tx_hash="0x" + h_init.hex(), network=network,
+               block=receipt_init.blockNumber, gas_used=receipt_init.gasUsed, amount=amount, symbol=symbol)
 
     # Register with oracle
     print_panel("Register Escrow", tone="info")
@@ -440,61 +1285,71 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
             "recipient_email": recipient_email,
         }
         headers = {"content-type": "application/json"}
-        r = requests.post(f"{CHAINSETTLE_API_URL}/settlement/register_settlement",
-                         json=payload, headers=headers)
+        r = chainsettle_request("POST", "/settlement/register_settlement",
+                                json=payload, headers=headers)
         r.raise_for_status()
         resp = r.json()
 
+    emit_event("register", settlement_id=settlement_id, user_url=resp.get('settlement_info', {}).get('user_url'))
     if 'user_url' in resp.get('settlement_info', {}):
         print_status(f"User URL: {resp['settlement_info']['user_url']}", level="success")
-        webbrowser.open(resp['settlement_info']['user_url'])
+        open_user_url(resp['settlement_info']['user_url'])
     else:
         print_status("User URL not found in response.", level="warn")
 
-    old_balance = erc20.functions.balanceOf(recipient).call() if erc20 else w3.eth.get_balance(recipient)
-    old_human_balance = old_balance / (10 ** token_decimals)
-
     # Poll status
     print_panel("Polling Escrow Status", tone="info")
     poll_status_func(escrow_id, bridge)
 
-    new_balance = erc20.functions.balanceOf(recipient).call() if erc20 else w3.eth.get_balance(recipient)
-    new_human_balance = new_balance / (10 ** token_decimals)
+    cache.set("last_salt", salt)
+    cache.set("last_settlement_id", settlement_id)
+    cache.set("last_escrow_id", escrow_id)
+
+    # Verify from the settlement receipt rather than before/after balance reads
+    settlement = verify_settlement(w3, bridge, escrow_id_bytes, recipient, token_address,
+                                   receipt_init.blockNumber)
+    if settlement is None:
+        print_status("No settlement found on-chain for this escrow yet.", level="warn")
+        raise click.ClickException("Escrow not settled.")
+
+    amount_raw = settlement["amount_raw"]
+    paid_human = amount_raw / (10 ** token_decimals) if amount_raw is not None else None
 
-    # Display balance changes
     rows = [
-        ("Before", f"{old_human_balance:.6f} {symbol}"),
-        ("After", f"{new_human_balance:.6f} {symbol}"),
-        ("Change", f"+{new_human_balance - old_human_balance:.6f} {symbol}"),
+        ("Recipient", recipient),
+        ("Paid", f"{paid_human:.6f} {symbol}" if paid_human is not None else "unknown"),
+        ("Settlement Tx", settlement["tx_hash"][:20] + "..."),
     ]
-    print_table(["Balance", "Amount"], rows, title="User Balance")
-
-    escrow = get_payment(escrow_id_bytes, bridge)
+    print_table(["Field", "Value"], rows, title="Settlement")
+    emit_event("settlement", escrow_id=escrow_id, tx_hash=settlement["tx_hash"], block=settlement["block"],
+               recipient=recipient, amount_paid=paid_human, amount_paid_raw=amount_raw, symbol=symbol)
+    print_status(f"Explorer: {EXPL_URL}{settlement['tx_hash']}", level="info")
 
     print_panel("Final Escrow Payment Details", tone="success")
 
-    # USDC has 6 decimals
-    escrow['requestedAmount'] = escrow.get("requestedAmount") / 1e6
-    escrow['requestedAmountUsd'] = escrow.get("requestedAmountUsd") / 1e6
-
-    escrow['postedAmount'] = escrow.get("postedAmount") / 1e6
-    escrow['postedAmountUsd'] = escrow.get("postedAmountUsd") / 1e6
-    escrow["escrow_id"] = escrow_id
-    escrow["network"] = network
-
-    cache.set("last_salt", salt)
-    cache.set("last_settlement_id", settlement_id)
-    cache.set("last_escrow_id", escrow_id)
+    escrow = {
+        "escrow_id": escrow_id,
+        "network": network,
+        "recipient": recipient,
+        "symbol": symbol,
+        "amountPaid": paid_human,
+        "amountPaidRaw": amount_raw,
+        "initTxHash": "0x" + h_init.hex(),
+        "settlementTxHash": settlement["tx_hash"],
+        "settlementBlock": settlement["block"],
+        "settlementEvent": settlement["event"],
+    }
 
     print_json(escrow)
     print_status("Payment complete.", level="success")
 
 @click.command()
 @click.option("--amount", default=1, type=int, help="Amount of BDAG/USDC you wish to receive.")
-@click.option("--network", default="base-sepolia", type=click.Choice(SUPPORTED_NETWORKS), help="Blockchain network to use.")
+@click.option("--network", default="base-sepolia", type=NetworkType(), help="Blockchain network to use.")
 @click.option("--recipient", default=None, type=str, help="EVM address of the recipient, defaults to sender address if not provided.")
 @click.option(
     "--private-key",
+    cls=PrivateKeyOption,
     envvar="PRIVATE_KEY",
     prompt="Enter your private key",
     hide_input=True,
@@ -502,18 +1357,19 @@ def pay(amount, network, recipient, private_key, force, verbose, gas_estimate_fa
 )
 @click.option("--gas-estimate-factor", default=1.25, type=float, help="Factor to scale the gas estimate by.")
 @click.option("-f", "--force", is_flag=True, help="Force the payment even if account is under estimated gas.")
-def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, force):
+@click.option("--plan", default=None, type=click.Path(exists=True, dir_okay=False), help="Plan file from the `plan` command to take salt/settlement ID from.")
+@click.option("--plan-index", default=None, type=int, help="Plan entry to use, defaults to the next unused entry.")
+def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, force, plan, plan_index):
     """Initialize an escrow payment on-chain only (no oracle registration)."""
     print_panel("Initialize Escrow (On-chain Only)", tone="info")
 
-    GATEWAY = NETWORK_CONFIG[network]["gateway"]
-    EXPL_URL = NETWORK_CONFIG[network]["explorer"]
+    EXPL_URL = get_network(network)["explorer"]
 
     print_status(f"Initializing escrow on {network} for amount: {amount}...", level="info")
 
     try:
-        w3 = Web3(Web3.HTTPProvider(GATEWAY))
-        account = w3.eth.account.from_key(private_key)
+        w3, bridge = make_bridge(network)
+        account = Signer(w3, private_key)
         print_status(f"Using account: {account.address[:20]}...", level="info")
     except Exception as e:
         print_status(f"Error setting up Web3 or account: {e}", level="error")
@@ -525,10 +1381,7 @@ def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, fo
     if not recipient:
         recipient = account.address
 
-    contract_address = escrow_bridge_config[network]['address']
-    bridge_abi = escrow_bridge_config[network]['abi']
-
-    bridge = w3.eth.contract(address=contract_address, abi=bridge_abi)
+    contract_address = bridge.address
 
     recipient_email = bridge.functions.recipientEmail().call()
     print_status(f"Recipient Email: {recipient_email}", level="info")
@@ -536,17 +1389,7 @@ def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, fo
     min_raw = bridge.functions.minPaymentAmount().call()
     max_raw = bridge.functions.maxPaymentAmount().call()
 
-    try:
-        usdc_address = bridge.functions.usdcToken().call()
-        erc20 = w3.eth.contract(address=usdc_address, abi=erc20_abi)
-        token_decimals = erc20.functions.decimals().call()
-        symbol = "USDC"
-        token_address = usdc_address
-    except Exception as e:
-        token_decimals = 18
-        symbol = "BDAG"
-        token_address = ZERO_ADDRESS
-        erc20 = None
+    erc20, token_address, token_decimals, symbol = resolve_token(w3, bridge, network)
 
     fee = bridge.functions.fee().call()
     FEE_DENOMINATOR = bridge.functions.FEE_DENOMINATOR().call()
@@ -570,20 +1413,12 @@ def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, fo
         print_status(f"Amount {amount} {symbol} exceeds available funds ({human_ramp_balance:.6f} {symbol})", level="error")
         raise click.ClickException("Insufficient bridge funds.")
 
-    salt = generate_salt()
-    if not salt.startswith("0x"):
-        salt = "0x" + salt
-
-    salt_bytes = Web3.to_bytes(hexstr=salt)
-    settlement_id = secrets.token_hex(18)
-
-    escrow_id_bytes = w3.solidity_keccak(
-        ["bytes32", "string"],
-        [salt_bytes, settlement_id]
-    )
+    salt, settlement_id, escrow_id_bytes, plan_index = prepare_escrow_ids(plan, plan_index, network)
 
     escrow_id = escrow_id_bytes.hex()
     print_status(f"Computed escrow_id = {escrow_id[:24]}...", level="highlight")
+    emit_event("escrow_id", escrow_id=escrow_id, salt=salt, settlement_id=settlement_id,
+               network=network, plan_index=plan_index)
 
     with progress_bar("Sending transaction...") as progress:
         task = progress.add_task("Submitting to blockchain...", total=None)
@@ -623,8 +1458,7 @@ def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, fo
             "maxFeePerGas": max_fee,
             "type": 2
         })
-        signed_init = account.sign_transaction(base_tx)
-        h_init = w3.eth.send_raw_transaction(signed_init.raw_transaction)
+        h_init = w3.eth.send_raw_transaction(account.sign(base_tx))
         receipt_init = w3.eth.wait_for_transaction_receipt(h_init)
 
     if receipt_init.status != 1:
@@ -633,6 +1467,8 @@ def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, fo
 
     print_status(f"initPayment submitted {symbol_map['arrow']} Tx: 0x{h_init.hex()}", level="success")
     print_status(f"Explorer: {EXPL_URL}0x{h_init.hex()}", level="info")
+    emit_event("init_payment", escrow_id=escrow_id, tx_hash="0x" + h_init.hex(), network=network,
+               block=receipt_init.blockNumber, gas_used=receipt_init.gasUsed, amount=amount, symbol=symbol)
 
     info = {
         "settlement_id": settlement_id,
@@ -655,7 +1491,9 @@ def init_escrow(amount, network, recipient, private_key, gas_estimate_factor, fo
 @click.command()
 @click.option("--salt", default = None, help="The salt used in the escrow initialization.")
 @click.option("--settlement-id", default = None,  help="The settlement ID used in the escrow initialization.")
-def register_settlement(salt, settlement_id):
+@click.option("--plan", default=None, type=click.Path(exists=True, dir_okay=False), help="Plan file to take salt/settlement ID from.")
+@click.option("--plan-index", default=None, type=int, help="Plan entry to register (required with --plan).")
+def register_settlement(salt, settlement_id, plan, plan_index):
     """Register escrow offchain data with the ChainSettle oracle."""
     print_panel("Register Escrow", tone="info")
     print_status("Registering offchain data with the ChainSettle oracle...", level="info")
@@ -664,15 +1502,21 @@ def register_settlement(salt, settlement_id):
         print_status("ChainSettle API is not reachable. Off-chain registration will fail.", level="error")
         raise click.ClickException("ChainSettle API unreachable.")
 
+    if plan:
+        if plan_index is None:
+            raise click.ClickException("--plan-index is required with --plan.")
+        entry = read_plan_entry(plan, plan_index)
+        salt, settlement_id = entry["salt"], entry["settlement_id"]
+
     # Use global if not passed as argument
     if salt is None:
-        salt = cache.get("last_salt")
+        salt = cache_get("last_salt")
         if not salt:
             print_status("No salt provided and no cached salt found.", level="error")
             raise click.ClickException("No salt provided.")
 
     if settlement_id is None:
-        settlement_id = cache.get("last_settlement_id")
+        settlement_id = cache_get("last_settlement_id")
         if not settlement_id:
             print_status("No settlement ID provided and no cached settlement_id found.", level="error")
             raise click.ClickException("No settlement ID provided.")
@@ -685,21 +1529,45 @@ def register_settlement(salt, settlement_id):
             "recipient_email": "treasury@lp.com",
         }
         headers = {"content-type": "application/json"}
-        r = requests.post(f"{CHAINSETTLE_API_URL}/settlement/register_settlement",
-                         json=payload, headers=headers)
+        r = chainsettle_request("POST", "/settlement/register_settlement",
+                                json=payload, headers=headers)
         r.raise_for_status()
         resp = r.json()
 
+    emit_event("register", settlement_id=settlement_id, user_url=resp.get('settlement_info', {}).get('user_url'))
     if 'user_url' in resp.get('settlement_info', {}):
         print_status(f"User URL: {resp['settlement_info']['user_url']}", level="success")
-        webbrowser.open(resp['settlement_info']['user_url'])
+        open_user_url(resp['settlement_info']['user_url'])
     else:
         print_status("User URL not found in response.", level="warn")
 
+@click.command()
+@click.option("--count", default=100, type=click.IntRange(min=1), help="Number of escrow IDs to generate.")
+@click.option("--network", default="base-sepolia", type=NetworkType(), help="Network the plan is intended for.")
+@click.option("-o", "--plan-file", "output_path", default="escrow_plan.bin", type=click.Path(dir_okay=False, writable=True), help="Path of the plan file to write.")
+def plan(count, network, output_path):
+    """Precompute salts, settlement IDs and escrow IDs for a batch."""
+    print_panel(f"Plan Escrow Batch\nCount: {count}\nNetwork: {network}", tone="info")
+
+    start = time.perf_counter()
+    with progress_bar("Hashing...") as progress:
+        task = progress.add_task("Generating escrow IDs...", total=None)
+        records = generate_plan(count)
+        header = write_plan(output_path, records, network)
+    elapsed = time.perf_counter() - start
+
+    print_status(f"Wrote {count} entries to {output_path} in {elapsed:.2f}s", level="success")
+    cache.delete(plan_cursor_key(output_path))
+    cache.evict(plan_cursor_key(output_path))
+
+    first = read_plan_entry(output_path, 0)
+    print_json({"plan": output_path, "header": header, "first_entry": first})
+
 @click.command()
 @click.option("--escrow-id", default = None, help="The escrow ID hash to settle.")
 @click.option(
     "--private-key",
+    cls=PrivateKeyOption,
     envvar="PRIVATE_KEY",
     prompt="Enter your private key",
     hide_input=True,
@@ -713,7 +1581,7 @@ def settle(escrow_id, private_key, gas_estimate_factor):
 
     # Use global if not passed as argument
     if escrow_id is None:
-        escrow_id = cache.get("last_escrow_id")
+        escrow_id = cache_get("last_escrow_id")
         if not escrow_id:
             print_status("No escrow ID provided and no cached escrow_id found.", level="error")
             raise click.ClickException("No escrow ID provided.")
@@ -728,16 +1596,16 @@ def settle(escrow_id, private_key, gas_estimate_factor):
     is_settled = bridge.functions.isSettled(escrow_id_bytes).call()
     if is_settled:
         print_status(f"Escrow ID {escrow_id[:20]}... is already settled on {network}.", level="warn")
+        emit_event("settle", escrow_id=escrow_id, network=network, success=True, already_settled=True)
         return
 
-    GATEWAY = NETWORK_CONFIG[network]["gateway"]
-    EXPL_URL = NETWORK_CONFIG[network]["explorer"]
+    EXPL_URL = get_network(network)["explorer"]
 
     print_status(f"Settling escrow ID: {escrow_id[:20]}... on {network}", level="info")
 
     try:
-        w3 = Web3(Web3.HTTPProvider(GATEWAY))
-        account = w3.eth.account.from_key(private_key)
+        w3 = make_web3(network)
+        account = Signer(w3, private_key)
     except Exception as e:
         print_status(f"Error setting up Web3 or account: {e}", level="error")
         raise click.ClickException(str(e))
@@ -768,23 +1636,30 @@ def settle(escrow_id, private_key, gas_estimate_factor):
             "type": 2
         })
 
-        signed_tx = account.sign_transaction(base_tx)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = w3.eth.send_raw_transaction(account.sign(base_tx))
         receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
 
+    transfers = bridge_transfers(receipt, bridge.address)
+    emit_event("settle", escrow_id=escrow_id, tx_hash="0x" + tx_hash.hex(), network=network,
+               success=receipt.status == 1, block=receipt.blockNumber, gas_used=receipt.gasUsed,
+               transfers=transfers)
     if receipt.status == 1:
+        for transfer in transfers:
+            print_status(f"Transferred {transfer['amount_raw']} (raw) of {transfer['token']} to {transfer['to']}", level="info")
         print_status(f"Payment settled {symbol_map['arrow']} {EXPL_URL}0x{tx_hash.hex()}", level="success")
     else:
         print_status(f"Transaction failed {symbol_map['arrow']} {EXPL_URL}0x{tx_hash.hex()}", level="error")
 
 cli.add_command(pay)
 cli.add_command(init_escrow)
+cli.add_command(plan)
 cli.add_command(register_settlement)
 cli.add_command(settle)
 cli.add_command(poll_status)
 cli.add_command(payment_info)
 cli.add_command(health)
 cli.add_command(config)
+cli.add_command(networks)
 
 if __name__ == "__main__":
     cli()
\ No newline at end of file